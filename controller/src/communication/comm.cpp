@@ -4,6 +4,17 @@
 
 Communication comm;  // Define communication instance globally here
 
+// Select the message serialization format
+#ifdef ENABLE_MSGPACK_SERIALIZATION
+#define DESERIALIZE_MESSAGE deserializeMsgPack
+#define SERIALIZE_MESSAGE serializeMsgPack
+#define MEASURE_MESSAGE measureMsgPack
+#else
+#define DESERIALIZE_MESSAGE deserializeJson
+#define SERIALIZE_MESSAGE serializeJson
+#define MEASURE_MESSAGE measureJson
+#endif
+
 Communication::Communication() {
   /*
   Initial values of interface can be defined here.
@@ -113,13 +124,27 @@ Communication::ReceiveCode Communication::receive_packet() {
 
         // Try deserialization now that packet has been fully received. Don't use zero-copy mode since buffer may not be changed inplace as it is needed for the debug message.
         StaticJsonDocument<JSON_DOC_SIZE_RX> rx_doc;
-        const DeserializationError err = deserializeJson(rx_doc, (const char *)RX_BUFFER + rx_message_start, rx_message_length);
+        const DeserializationError err = DESERIALIZE_MESSAGE(rx_doc, (const char *)RX_BUFFER + rx_message_start, rx_message_length);
 
         if (err) {
           message_append(F("Error: "));
           message_append(err.f_str());
+#ifdef ENABLE_MSGPACK_SERIALIZATION
+          // MessagePack is binary, so echo the message hex encoded to keep the status message readable
+          char hex_str[8];
+          snprintf(hex_str, sizeof(hex_str), "%u", (unsigned int)rx_message_length);
+          message_append(F(" when deserializing "));
+          message_append(hex_str, strlen(hex_str));
+          message_append(F(" bytes: "));
+          for (uint16_t i = 0; i < rx_message_length; i++) {
+            snprintf(hex_str, sizeof(hex_str), "%02X", (uint8_t)RX_BUFFER[rx_message_start + i]);
+            if (!message_append(hex_str, 2)) break;  // Stop once the status message buffer is full
+          }
+          message_enqueue_for_transmit(F(""));
+#else
           message_append(F(" when deserializing: "));
           message_enqueue_for_transmit(RX_BUFFER + rx_message_start, rx_message_length);
+#endif
           return ReceiveCode::DESERIALIZATION_FAILED;
         }
 
@@ -168,16 +193,16 @@ Communication::ReceiveCode Communication::async_receive() {
 // Builds a packet from tx_doc with a 3 bytes header (start token (1 byte) + message length (2 bytes)) prepended in dest.
 // Returns the length of the packet built by this function.
 size_t Communication::build_packet(const JsonDocument &tx_doc, char *dest, size_t dest_size) {
-  // There must be space for the three header bytes + json message length
-  if (dest_size < 3 + measureJson(tx_doc)) return 0;
+  // There must be space for the three header bytes + message length
+  if (dest_size < 3 + MEASURE_MESSAGE(tx_doc)) return 0;
 
-  size_t data_len = serializeJson(tx_doc, dest + 3, dest_size - 3);
+  size_t data_len = SERIALIZE_MESSAGE(tx_doc, dest + 3, dest_size - 3);
   dest[0] = PACKET_START_TOKEN;
 
   // Big endian byte format for length information
   dest[1] = highByte(data_len);
   dest[2] = lowByte(data_len);
-  return 3 + data_len;  // 3 bytes header + Json msg length
+  return 3 + data_len;  // 3 bytes header + msg length
 }
 
 // Appends a data packet inferred from tx_doc to the transmit buffer.
@@ -192,7 +217,7 @@ Communication::TransmitCode Communication::enqueue_for_transmit(const JsonDocume
     tx_buf_head += packet_size;
     return TransmitCode::TX_SUCCESS;
   }
-  if (3 + measureJson(tx_doc) > TX_BUFFER_SIZE) return TransmitCode::TX_BUFFER_TOO_SMALL_TO_FIT_DATA;  // This occurs if the data is too big to fit in the transmit buffer
+  if (3 + MEASURE_MESSAGE(tx_doc) > TX_BUFFER_SIZE) return TransmitCode::TX_BUFFER_TOO_SMALL_TO_FIT_DATA;  // This occurs if the data is too big to fit in the transmit buffer
   return TransmitCode::TRANSMIT_RATE_TOO_LOW;                                                          // This occurs if the buffer cannot be depleted faster than new data is added. The buffer would overflow if the recent packet would be added, so it is discarded.
 }
 
@@ -261,7 +286,7 @@ void Communication::message_transmit_now(const __FlashStringHelper *msg) {
   message_append(msg);
   StaticJsonDocument<8 + TX_STATUS_MSG_BUFFER_SIZE> status_msg_doc;
   status_msg_doc[STATUS_MESSAGE_KEY] = TX_STATUS_MSG_BUFFER;
-  const size_t buf_size = 3 + measureJson(status_msg_doc);  // Account for 3 bytes header + json message length
+  const size_t buf_size = 3 + MEASURE_MESSAGE(status_msg_doc);  // Account for 3 bytes header + message length
   char buffer[buf_size]{ 0 };
   size_t status_msg_size = build_packet(status_msg_doc, buffer, buf_size);
   while (async_transmit() > 0) {};        // Wait for pending data to be transmitted to not corrupt the stream
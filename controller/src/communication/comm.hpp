@@ -7,6 +7,10 @@
 // Comment in/out to change receiving approach. If commented out, data is received by sequential polling inside loop().
 #define ENABLE_RX_INTERRUPT_POLLING
 
+// Comment in/out to change the message serialization format. If commented out, messages are serialized as human readable JSON which eases debugging.
+// This has to match the MSGPACK_SERIALIZATION setting of the GUI.
+#define ENABLE_MSGPACK_SERIALIZATION
+
 class Communication {
 public:
   ReceiveInterface rx_data;
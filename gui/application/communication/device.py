@@ -1,22 +1,28 @@
 import time
-import json
+import queue
+import socket
+import struct
+import orjson
+import msgpack
 import warnings
 import select
 import configuration as config
 
-from bluetooth import discover_devices, BluetoothSocket
+from contextlib import contextmanager
+from bluetooth import discover_devices
 from ..helper import PROGRAM_START_TIMESTAMP, program_uptime
-from .interface import DataInterface, DataInterfaceDefinition, JsonInterfaceReader
+from .interface import DataInterface, DataInterfaceDefinition, JsonInterfaceReader, StampedData
 
 INTERFACE_JSON = JsonInterfaceReader(config.JSON_INTERFACE_DEFINITION_PATH)
 
 
+# Both interfaces are only accessed by the GUI thread. The transmit and receive workers exchange plain data with it through signals and queues.
 class ReceiveInterface(DataInterface):
     STATUS_MESSAGE_KEY = "msg"
     DEFINITION = DataInterfaceDefinition((STATUS_MESSAGE_KEY, str), **INTERFACE_JSON.from_device)
 
     def __init__(self):
-        super().__init__(self.DEFINITION, lambda: self._last_receive_ts - PROGRAM_START_TIMESTAMP)
+        super().__init__(self.DEFINITION, lambda: self._last_receive_ts - PROGRAM_START_TIMESTAMP, thread_safe=False)
         self._last_receive_ts = 0
 
     def update_receive_time(self):
@@ -31,17 +37,22 @@ class TransmitInterface(DataInterface):
     DEFINITION = DataInterfaceDefinition(**INTERFACE_JSON.to_device)
 
     def __init__(self):
-        super().__init__(self.DEFINITION, program_uptime)
+        super().__init__(self.DEFINITION, program_uptime, thread_safe=False)
 
 
 class BluetoothDevice:
     MSG_START_TOKEN = b'$'
     MSG_START_TOKEN_LEN = len(MSG_START_TOKEN)
-    MSG_SIZE_HINT_LEN = 2
+    MSG_SIZE_HINT = struct.Struct(">H")  # Message length as 2 byte unsigned big-endian integer
+    MSG_SIZE_HINT_LEN = MSG_SIZE_HINT.size
     MSG_HEADER_LEN = MSG_START_TOKEN_LEN + MSG_SIZE_HINT_LEN
+    MSG_MAX_LEN = 2 ** (8 * MSG_SIZE_HINT_LEN) - 1
     CONNECT_TIMEOUT_SEC = 10
+    IO_TIMEOUT_SEC = 1
     RX_CHUNK_SIZE = 4096
     ALLOWED_RX_BUFFERBLOAT = 1024
+    TX_QUEUE_TIMEOUT_SEC = 0.1
+    RX_WAIT_TIMEOUT_SEC = 0.1
 
     class NotConnectedError(Exception):
         pass
@@ -52,10 +63,22 @@ class BluetoothDevice:
     def __init__(self, address: str):
         self._address = address
         self._rx_buffer = bytearray()
+        self._rx_chunk = bytearray(self.RX_CHUNK_SIZE)  # Reusable receive buffer so that socket reads don't allocate
+        self._rx_chunk_view = memoryview(self._rx_chunk)
+        self._tx_packet = bytearray(self.MSG_HEADER_LEN + self.MSG_MAX_LEN)  # Reusable transmit buffer that fits any message so that sending doesn't allocate
+        self._tx_packet[:self.MSG_START_TOKEN_LEN] = self.MSG_START_TOKEN
+        self._tx_packet_view = memoryview(self._tx_packet)
+        self._tx_packet_data: dict | None = None  # Data of the packet currently held by the transmit buffer
+        self._tx_packet_len = 0
+        self._packer = msgpack.Packer(default=DataInterface.serializable, use_single_float=True, autoreset=False)  # Keeps its internal buffer between messages
         self._connected = False
-        self._socket: BluetoothSocket | None = None
+        self._socket: socket.socket | None = None
+        self._rx_poller: select.poll | None = None
         self._rx_data = ReceiveInterface()
         self._tx_data = TransmitInterface()
+        self._tx_sent: dict[str, any] = {}  # Plain nested values that have been transmitted to the device since connecting
+        self._tx_queue: queue.SimpleQueue[tuple[dict, bool]] = queue.SimpleQueue()  # Messages waiting for transmit() together with their only_changed flag
+        self._tx_batch: list[dict | bool] | None = None  # Merged message and only_changed flag of the active batch()
 
     @property
     def tx_data(self):
@@ -67,28 +90,45 @@ class BluetoothDevice:
 
     def connect(self):
         if not self._connected:
-            self._socket = BluetoothSocket()
+            # The native RFCOMM socket is used since it supports reading into preallocated buffers
+            self._socket = socket.socket(socket.AF_BLUETOOTH, socket.SOCK_STREAM, socket.BTPROTO_RFCOMM)
             self._socket.settimeout(self.CONNECT_TIMEOUT_SEC)
             self._socket.connect((self._address, 1))
+            # The timeout applies to sends and reads of available data. It is set once here, since changing it costs a syscall each time.
+            # Whether there is anything to receive at all is polled instead, because a non-blocking socket would break sendall() on the transmit thread.
+            self._socket.settimeout(self.IO_TIMEOUT_SEC)
+            if hasattr(select, "poll"):  # Not available on Windows where select() is used instead
+                self._rx_poller = select.poll()  # Registered once so that polling doesn't have to pass the socket to the kernel each time
+                self._rx_poller.register(self._socket, select.POLLIN)
+            # Unlike TCP, RFCOMM doesn't delay small writes to coalesce them (there is no Nagle algorithm and thus no TCP_NODELAY option),
+            # so every packet is handed to the link right away. The send buffer size is left at the default, since a smaller one would
+            # just make sendall() block the transmit thread while the slow serial link drains it.
             self._connected = True
 
     def disconnect(self):
         if self._connected:
+            self._rx_poller = None
             self._socket.close()
             self._socket = None
             self._connected = False
+            self._tx_sent.clear()
+            while not self._tx_queue.empty():  # Discard messages that weren't transmitted anymore
+                self._tx_queue.get_nowait()
 
-    def send(self, *, data: dict = None, key: str | tuple = None, **update):
+    def send(self, *, data: dict = None, key: str | tuple = None, only_changed: bool = False, **update):
         """
-        Sends data to the device.
+        Queues data to be sent to the device. The data is serialized and written to the socket by transmit(), so that the calling thread doesn't block.
 
         :param data: The dictionary containing the data that is to be sent.
         :param key: The key referring to the data stored inside the transmit interface object. Any subordinate data will be sent. That also includes nested data.
+        :param only_changed: If true, only the values that differ from what has already been transmitted since connecting are sent. Nothing is sent if there are no such values.
         :param update: Keyword arguments specifying transmit data inline. The transmit interface object and argument data will be updated with the values specified before data is sent.
         """
         if self._connected:
             if data is None:
                 data = {}
+            elif isinstance(data, DataInterface):
+                data = data.as_dict()
             if update:
                 self._tx_data.update(update)  # Update tx data interface. This simultaneously verifies that the data is consistent with the interface.
                 data.update(update)
@@ -101,71 +141,211 @@ class BluetoothDevice:
                     if len(k):
                         first, rest = k[0], k[1:]
                         return {first: create_root_dict(rest)}
-                    return self._tx_data[key]
+                    value = self._tx_data[key]
+                    return value.as_dict() if isinstance(value, DataInterface) else value.value
 
                 data.update(create_root_dict(key))
 
-            # Send data specified in the arguments
-            json_data = json.dumps(data, separators=(',', ':'), cls=DataInterface.JSONEncoder).encode()
-            packet = self.MSG_START_TOKEN + len(json_data).to_bytes(2, "big") + json_data
+            if self._tx_batch is not None:
+                self._merge(data, self._tx_batch[0])
+                self._tx_batch[1] = self._tx_batch[1] and only_changed
+            else:
+                self._tx_queue.put((data, only_changed))
+        else:
+            raise self.NotConnectedError("Cannot send when device is not connected via Bluetooth!")
+
+    @contextmanager
+    def batch(self):
+        """
+        Merges the data of all sends within the context into a single message that is queued when the context is left.
+        Later values replace earlier ones. Nested batches are merged into the outermost one.
+        """
+        if self._tx_batch is not None:
+            yield
+            return
 
-            # Send the packet
+        self._tx_batch = [{}, True]
+        try:
+            yield
+        finally:
+            data, only_changed = self._tx_batch
+            self._tx_batch = None
+            if data and self._connected:
+                self._tx_queue.put((data, only_changed))
+
+    def transmit(self, timeout: float = TX_QUEUE_TIMEOUT_SEC):
+        """
+        Waits for queued messages and sends them to the device. All messages that are queued at once are merged into a single message
+        where later values replace earlier ones. It is meant to be executed repeatedly by a worker thread.
+
+        :param timeout: Time in seconds to wait for a message to be queued.
+        """
+        if self._connected:
+            try:
+                data, only_changed = self._tx_queue.get(timeout=timeout)
+            except queue.Empty:
+                return
+            while not self._tx_queue.empty():
+                queued_data, queued_only_changed = self._tx_queue.get_nowait()
+                self._merge(queued_data, data)
+                only_changed = only_changed and queued_only_changed
+
+            changes = self._diff(data, self._tx_sent)
+            if only_changed:
+                if not changes:
+                    return
+                data = changes
+
+            if data == self._tx_packet_data:  # The transmit buffer still holds the packet for identical data, so serializing can be skipped
+                packet = self._tx_packet_view[:self._tx_packet_len]
+            else:
+                self._tx_packet_data = None  # Invalidate in case serializing fails midway
+                packet = self._write_packet(data)
+                self._tx_packet_data, self._tx_packet_len = data, len(packet)
             self._socket.sendall(packet)
+            self._merge(changes, self._tx_sent)
         else:
-            raise self.NotConnectedError("Cannot send when device is not connected via Bluetooth!")
+            raise self.NotConnectedError("Cannot transmit when device is not connected via Bluetooth!")
+
+    def _recv_chunk(self):
+        """
+        Reads the available bytes from the socket into the reusable chunk buffer and appends them to the receive buffer.
+        """
+        n = self._socket.recv_into(self._rx_chunk_view)
+        if n == 0:  # If socket was closed from other side
+            raise ConnectionAbortedError("Connection was closed from the other side.")
+        self._rx_buffer.extend(self._rx_chunk_view[:n])
+
+    def _rx_available(self, timeout: float = 0) -> bool:
+        """
+        Checks whether there is data available to receive.
+
+        :param timeout: Time in seconds to wait for data to arrive. By default, this doesn't block.
+        """
+        if self._rx_poller is not None:
+            return bool(self._rx_poller.poll(timeout * 1000))
+        return bool(select.select([self._socket], [], [], timeout)[0])
 
-    def receive(self):
+    def receive(self, timeout: float = RX_WAIT_TIMEOUT_SEC) -> list[bytes]:
+        """
+        Waits for data and then reads all data available on the socket and extracts every complete message from it. Incomplete messages remain buffered for the next call.
+        Waiting keeps a worker thread that executes this repeatedly from spinning and flooding its receivers with empty results.
+
+        :param timeout: Time in seconds to wait for data to arrive.
+        :return: The received messages in order of arrival. The list is empty if no message was completed.
+        """
         if self._connected:
-            if select.select([self._socket], [], [], 0)[0]:  # Check for available data
-                self._socket.settimeout(1)
-
-                # Receive header that contains start bit and message length
-                while True:
-                    b = self._socket.recv(self.RX_CHUNK_SIZE)
-                    if b == b'':  # If socket was closed from other side
-                        raise ConnectionAbortedError("Connection was closed from the other side.")
-                    self._rx_buffer.extend(b)
-                    msg_start = self._rx_buffer.find(self.MSG_START_TOKEN)
-                    if msg_start != -1:
-                        break
-                self._rx_buffer = self._rx_buffer[msg_start:]  # Remove msg start token from buffer
-
-                while len(self._rx_buffer) < self.MSG_HEADER_LEN:
-                    b = self._socket.recv(self.RX_CHUNK_SIZE)
-                    if b == b'':  # If socket was closed from other side
-                        raise ConnectionAbortedError("Connection was closed from the other side.")
-                    self._rx_buffer.extend(b)
-                msg_len = int.from_bytes(self._rx_buffer[self.MSG_START_TOKEN_LEN:self.MSG_START_TOKEN_LEN + self.MSG_SIZE_HINT_LEN], "big")
-                self._rx_buffer = self._rx_buffer[self.MSG_HEADER_LEN:]  # Remove msg header from buffer
-
-                # Receive actual message
-                while len(self._rx_buffer) < msg_len:
-                    b = self._socket.recv(self.RX_CHUNK_SIZE)
-                    if b == b'':  # If socket was closed from other side
-                        raise ConnectionAbortedError("Connection was closed from the other side.")
-                    self._rx_buffer.extend(b)
-                msg = self._rx_buffer[:msg_len]
-                self._rx_buffer = self._rx_buffer[msg_len:]  # Remove received message from buffer
-
-                if len(self._rx_buffer) > self.ALLOWED_RX_BUFFERBLOAT:
-                    warnings.warn(f"Bufferbloat is very large which means that incoming messages aren't processed fast enough. "
-                                  f"After message receive {len(self._rx_buffer)} bytes were left over in the buffer.", RuntimeWarning)
-                return bytes(msg)
-            return b''
+            if not self._rx_available(timeout):
+                return []
+            while self._rx_available():
+                self._recv_chunk()
+
+            if len(self._rx_buffer) > self.ALLOWED_RX_BUFFERBLOAT:
+                warnings.warn(f"Bufferbloat is very large which means that incoming messages aren't processed fast enough. "
+                              f"{len(self._rx_buffer)} bytes were pending in the buffer.", RuntimeWarning)
+            return list(self._extract_messages())
         else:
             raise self.NotConnectedError("Cannot receive when device is not connected via Bluetooth!")
 
-    def deserialize(self, received: bytes):
+    def _extract_messages(self):
+        """
+        Yields the complete messages contained in the receive buffer and removes them from it.
+        Consumed bytes are deleted from the front in place, which bytearray does without reallocating.
+        """
+        while True:
+            msg_start = self._rx_buffer.find(self.MSG_START_TOKEN)
+            if msg_start == -1:
+                self._rx_buffer.clear()  # Without a msg start token nothing in the buffer belongs to a message
+                return
+            del self._rx_buffer[:msg_start]  # Remove bytes preceding the msg start token from buffer
+
+            if len(self._rx_buffer) < self.MSG_HEADER_LEN:
+                return
+            msg_len, = self.MSG_SIZE_HINT.unpack_from(self._rx_buffer, self.MSG_START_TOKEN_LEN)
+            if len(self._rx_buffer) < self.MSG_HEADER_LEN + msg_len:
+                return
+
+            with memoryview(self._rx_buffer) as rx_view:
+                msg = bytes(rx_view[self.MSG_HEADER_LEN:self.MSG_HEADER_LEN + msg_len])  # Copy the message only once since it is handed to another thread
+            del self._rx_buffer[:self.MSG_HEADER_LEN + msg_len]  # Remove msg header and message from buffer
+            yield msg
+
+    @classmethod
+    def _diff(cls, data: dict, reference: dict) -> dict:
+        """
+        Returns the plain nested values of data that differ from the ones in reference.
+        """
+        changes = {}
+        for key, value in data.items():
+            if isinstance(value, dict):
+                nested_changes = cls._diff(value, reference.get(key, {}))
+                if nested_changes:
+                    changes[key] = nested_changes
+            else:
+                if isinstance(value, StampedData):
+                    value = value.value
+                if key not in reference or reference[key] != value:
+                    changes[key] = value
+        return changes
+
+    @classmethod
+    def _merge(cls, changes: dict, reference: dict):
+        for key, value in changes.items():
+            if isinstance(value, dict):
+                cls._merge(value, reference.setdefault(key, {}))
+            else:
+                reference[key] = value
+
+    def _write_packet(self, data: dict) -> memoryview:
+        """
+        Serializes data into the reusable transmit buffer and prepends the message header.
+
+        :param data: The dictionary containing the data that is to be sent.
+        :return: A view of the transmit buffer containing the whole packet. It is only valid until the next call.
+        """
+        if config.MSGPACK_SERIALIZATION:
+            # The controller uses 4 byte doubles, so sending floats in single precision doesn't lose information
+            self._packer.pack(data)
+            msg = self._packer.getbuffer()
+        else:
+            # Stamped data is a dataclass which orjson would otherwise serialize natively as a whole
+            msg = orjson.dumps(data, default=DataInterface.serializable, option=orjson.OPT_PASSTHROUGH_DATACLASS)
+
         try:
-            new_data: dict[str, any] = json.loads(received.decode())
-        except ValueError:
+            msg_len = len(msg)
+            if msg_len > self.MSG_MAX_LEN:
+                raise ValueError(f"Message of {msg_len} bytes exceeds the maximum message length of {self.MSG_MAX_LEN} bytes.")
+            self.MSG_SIZE_HINT.pack_into(self._tx_packet, self.MSG_START_TOKEN_LEN, msg_len)
+            self._tx_packet_view[self.MSG_HEADER_LEN:self.MSG_HEADER_LEN + msg_len] = msg
+        finally:
+            if isinstance(msg, memoryview):
+                msg.release()
+                self._packer.reset()
+        return self._tx_packet_view[:self.MSG_HEADER_LEN + msg_len]
+
+    def deserialize(self, received: bytes | bytearray | memoryview):
+        try:
+            if config.MSGPACK_SERIALIZATION:
+                new_data: dict[str, any] = msgpack.unpackb(received, unicode_errors='replace')
+            else:
+                new_data: dict[str, any] = orjson.loads(received)
+        except (ValueError, msgpack.UnpackException):
             raise self.InvalidDataError(f"Could not interprete received data: {received}")
         else:
             self._rx_data.update(new_data)  # Update rx data interface. This simultaneously verifies that the data is consistent with the interface.
 
     @staticmethod
-    def discover():
-        nearby_devices = discover_devices(duration=5, lookup_names=True)
-        print(f"Found {len(nearby_devices)} devices:")
-        for addr, name in nearby_devices:
-            print(f"Adress: {addr} - Name: {name}")
+    def discover(duration: int = 5, flush_cache: bool = True, verbose: bool = True) -> list[tuple[str, str]]:
+        """
+        Searches for nearby Bluetooth devices. This blocks for the whole inquiry, so use a ConcurrentTask to call it from the GUI.
+
+        :param duration: Duration of the inquiry in units of 1.28 seconds.
+        :param flush_cache: If false, devices and names found by previous inquiries are reused, which makes repeated searches faster.
+        :param verbose: If true, the devices found are printed.
+        :return: List of address and name tuples of the devices found.
+        """
+        nearby_devices = discover_devices(duration=duration, flush_cache=flush_cache, lookup_names=True)
+        if verbose:
+            print(f"Found {len(nearby_devices)} devices:")
+            print("\n".join(f"Adress: {addr} - Name: {name}" for addr, name in nearby_devices))
+        return nearby_devices
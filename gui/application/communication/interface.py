@@ -1,9 +1,12 @@
 import re
-import json
+import orjson
 
+from contextlib import nullcontext
+from functools import partial
 from dataclasses import dataclass
 from pathlib import Path
-from threading import RLock
+from types import MappingProxyType
+from threading import Lock
 from collections import UserDict
 from typing import Callable, TypeVar
 
@@ -31,12 +34,11 @@ class JsonInterfaceReader:
 
     def __init__(self, file_path: Path):
         # Verify that json interface file is valid
-        with file_path.open() as interface_file:
-            self.json_dict = json.load(interface_file)
-            if not all([base_key in self.json_dict for base_key in [self.TO_DEVICE_KEY, self.FROM_DEVICE_KEY]]):
-                raise KeyError(f"Base key(s) not found! Specifiers for the data interface to and from the device "
-                               f"have to be exactly {self.TO_DEVICE_KEY} and {self.FROM_DEVICE_KEY} respectively. "
-                               f"Found {self.json_dict.keys()} instead.")
+        self.json_dict = orjson.loads(file_path.read_bytes())
+        if not all([base_key in self.json_dict for base_key in [self.TO_DEVICE_KEY, self.FROM_DEVICE_KEY]]):
+            raise KeyError(f"Base key(s) not found! Specifiers for the data interface to and from the device "
+                           f"have to be exactly {self.TO_DEVICE_KEY} and {self.FROM_DEVICE_KEY} respectively. "
+                           f"Found {self.json_dict.keys()} instead.")
 
     @property
     def to_device(self) -> dict[str, str | dict]:
@@ -52,7 +54,7 @@ DataInterfaceDefinitionType = TypeVar('DataInterfaceDefinitionType')
 
 class DataInterfaceDefinition(UserDict):
     # Maps the types that are allowed to be specified in the interface json file to Python types
-    TYPE_TRANSLATION = {
+    TYPE_TRANSLATION = MappingProxyType({
         "char[]": str,
         "bool": bool,
         "float": float,
@@ -66,13 +68,14 @@ class DataInterfaceDefinition(UserDict):
         "uint16_t": int,
         "uint32_t": int,
         "uint64_t": int,
-    }
+    })
+    ARRAY_SIZE_PATTERN = re.compile(r'\[\d+]')  # Matches the size specification of array types like char[32]
 
     class MissingCorrespondingType(Exception):
         pass
 
     def __init__(self, *members: tuple[str, type], **kw_members: type):
-        super().__init__({name: t for name, t in members}, **kw_members)
+        super().__init__(members, **kw_members)  # UserDict.update takes the name and type pairs directly
 
     def __getitem__(self: DataInterfaceDefinitionType, key: str | tuple) -> DataInterfaceDefinitionType:
         if isinstance(key, str):  # If dict is accessed using a single key
@@ -81,18 +84,26 @@ class DataInterfaceDefinition(UserDict):
             except KeyError:
                 raise UnmatchedKeyError(key, self) from None
         elif isinstance(key, tuple):  # If dict is accessed using multiple keys
-            if len(key) > 1:
-                return self.__getitem__(key[0]).__getitem__(key[1:])
-            return self.__getitem__(key[0])
+            d = self
+            for k in key:
+                try:
+                    d = d.data[k]
+                except KeyError:
+                    raise UnmatchedKeyError(k, d) from None
+            return d
         else:
             raise TypeError(f"Argument 'key' must be a string or a tuple of strings not {type(key)}.")
 
     def __setitem__(self, key: str, value):
         if isinstance(key, str):  # If dict is accessed using a single key
             if isinstance(value, str):
-                if value not in self.TYPE_TRANSLATION:
-                    raise self.MissingCorrespondingType(f"Type translation for '{value}' is missing.")
-                super().__setitem__(key, self.TYPE_TRANSLATION[re.sub(r'\[\d+]', '[]', value)])  # Replace arry size specification with just empty []
+                # Types are resolved once here, so that values of the interface can be validated without any parsing
+                type_name = self.ARRAY_SIZE_PATTERN.sub('[]', value)  # Replace array size specification with just empty []
+                try:
+                    defined_type = self.TYPE_TRANSLATION[type_name]
+                except KeyError:
+                    raise self.MissingCorrespondingType(f"Type translation for '{value}' is missing.") from None
+                super().__setitem__(key, defined_type)
                 return
             if isinstance(value, dict):
                 super().__setitem__(key, self.__class__(**value))
@@ -113,7 +124,7 @@ class DataInterfaceDefinition(UserDict):
         raise TypeError(f"Argument 'key' must be a string or a tuple of strings not {type(key)}.")
 
 
-@dataclass(frozen=True, eq=True)
+@dataclass(frozen=True, eq=True, slots=True)
 class StampedData:
     value: any
     timestamp: float | None
@@ -122,47 +133,64 @@ class StampedData:
 DataInterfaceType = TypeVar('DataInterfaceType')
 
 
-class DataInterface(UserDict):
+class DataInterface(dict):
     """
-    A thread safe dict-like object that acts like a runtime validated buffer for incoming and outgoing data.
+    A dict that acts like a runtime validated buffer for incoming and outgoing data.
     It can be arbitrarily nested and its values refer to a particular timestamp.
+    Being a dict itself, it can be handed to serializers directly.
+    Accesses are only locked if the interface is created with thread_safe=True.
+    Interfaces without locking, like the device's rx and tx data, must only be accessed from a single thread (the GUI thread).
     """
+    __slots__ = ("_access_lock", "_interface_def", "_stamper", "_setitem_callbacks", "_leaf_index")
 
     # This specifies the cases where conversion from set_type to defined_type is explicitly allowed when __setitem__ is called.
-    # A single or multiple types may be specified inside a list.
-    # Format: {set_type: list[defined_type(s)]).
-    # Example: Let's say I set interface["foo"] = 0, but "foo" is defined as float. If I want to allow conversion to float from int I add {int: [..., float, ...]} to the whitelist.
+    # A single or multiple types may be specified inside a tuple.
+    # Format: {set_type: tuple[defined_type(s)]).
+    # Example: Let's say I set interface["foo"] = 0, but "foo" is defined as float. If I want to allow conversion to float from int I add {int: (..., float, ...)} to the whitelist.
     CONVERSION_WHITELIST = {
-        int: [float, bool],
-        float: [int]
+        int: (float, bool),
+        float: (int,)
     }
 
-    class JSONEncoder(json.JSONEncoder):
-        def default(self, obj):
-            if isinstance(obj, DataInterface):
-                return obj.data
-            if isinstance(obj, StampedData):
-                return obj.value
-            return super().default(obj)
+    @staticmethod
+    def serializable(obj):
+        """
+        Returns the serializable representation of interface values. It is meant to be used as the fallback of encoders.
+        Interfaces themselves are dicts and need no conversion.
 
-    def __init__(self, interface_definition: DataInterfaceDefinition, stamper: Callable[[], float]):
+        :param obj: Object that is not natively serializable.
+        """
+        if isinstance(obj, StampedData):
+            return obj.value
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable.")
+
+    def __init__(self, interface_definition: DataInterfaceDefinition, stamper: Callable[[], float], thread_safe: bool = True):
         """
         Defines the interface.
 
         :param interface_definition: Instance of InterfaceDefinition.
         :param stamper: A function or method to be called everytime a value is set. This is used to get the timestamp of the set operation.
+        :param thread_safe: If false, accesses aren't locked. Only use this if the interface is accessed by a single thread.
         """
         super().__init__()
-        self._access_lock = RLock()
+        self._access_lock = Lock() if thread_safe else nullcontext()  # Never acquired reentrantly, which is why a plain lock suffices
         self._interface_def: UserDict[str, type | DataInterfaceDefinition] = interface_definition
         self._stamper = stamper
         self._setitem_callbacks: dict[str, Callable[[StampedData], None]] = {}
 
+        # Flat index of every leaf member: tuple path -> (owning interface, leaf key, defined type).
+        # It lets nested writes resolve their target with a single lookup instead of walking down the hierarchy.
+        self._leaf_index: dict[tuple[str, ...], tuple[DataInterface, str, type]] = {}
+
         for key, val in self._interface_def.items():
             if isinstance(val, DataInterfaceDefinition):
-                self.data[key] = DataInterface(val, stamper)
+                child = DataInterface(val, stamper, thread_safe)
+                super().__setitem__(key, child)
+                for path, leaf in child._leaf_index.items():
+                    self._leaf_index[(key, *path)] = leaf
             elif isinstance(val, type):
-                self.data[key] = StampedData(val(), None)  # Initialize by default value and None timestamp to indicate that data has not been received.
+                super().__setitem__(key, StampedData(val(), None))  # Initialize by default value and None timestamp to indicate that data has not been received.
+                self._leaf_index[(key,)] = (self, key, val)
             else:
                 raise TypeError(f"Wrong value type: {type(val)}! Only InterfaceDefinition and types allowed.")
 
@@ -195,12 +223,51 @@ class DataInterface(UserDict):
                 except KeyError:
                     raise UnmatchedKeyError(key, self) from None
             elif isinstance(key, tuple):  # If dict is accessed using multiple keys
-                if len(key) > 1:
-                    return self.__getitem__(key[0]).__getitem__(key[1:])
-                return self.__getitem__(key[0])
+                leaf = self._leaf_index.get(key)
+                if leaf is not None:  # Resolve leaves with a single lookup instead of walking the nested dicts
+                    return dict.__getitem__(leaf[0], leaf[1])
+                d = self
+                for k in key:
+                    try:
+                        d = dict.__getitem__(d, k)
+                    except KeyError:
+                        raise UnmatchedKeyError(k, d) from None
+                return d
             else:
                 raise TypeError(f"Argument 'key' must be a string or a tuple of strings not {type(key)}.")
 
+    def as_dict(self) -> dict:
+        """
+        Returns the current values as plain nested dict without timestamps.
+        Serializers can encode it in one pass without calling back into Python for every value.
+        """
+        with self._access_lock:
+            return {key: value.as_dict() if isinstance(value, DataInterface) else value.value for key, value in self.items()}
+
+    def get(self, key: str | tuple, default=None):
+        """
+        Get an item of the data interface or default if key doesn't match any member.
+
+        :param key: When accessing a single member, the key must be str. If the member is nested key must be tuple of str.
+        :param default: The value returned if key doesn't match any member.
+        """
+        try:
+            return self.__getitem__(key)
+        except UnmatchedKeyError:
+            return default
+
+    def getter(self, key: str | tuple) -> Callable[[], StampedData | DataInterfaceType]:
+        """
+        Returns a function that gets the member specified by key. Leaf members are resolved once here, so that calling the returned function is a single dict lookup.
+        Reading a single dict item is atomic, so the getter doesn't have to acquire the lock.
+
+        :param key: When accessing a single member, the key must be str. If the member is nested key must be tuple of str.
+        """
+        leaf = self._leaf_index.get(key if isinstance(key, tuple) else (key,))
+        if leaf is None:
+            return partial(self.__getitem__, key)
+        return partial(dict.__getitem__, leaf[0], leaf[1])
+
     def __setitem__(self, key: str | tuple, value):
         """
         Set an item of the data interface.
@@ -209,42 +276,70 @@ class DataInterface(UserDict):
         :param value: If multiple values are to be set value must be a dict of all values to be set. A value can be of any type.
         If value is not already a StampedData instance or a dict of those, a timestamp will be inferred using the stamper callable provided when constructed.
         """
-        with self._access_lock:
-            if isinstance(key, str):  # If dict is accessed using a single key
-                if key not in self.keys():
-                    raise UnmatchedKeyError(key, self)
-                if isinstance(self.__getitem__(key), DataInterface):
-                    if isinstance(value, dict):
-                        # Parse dict and try to assign values recursively
-                        for k, v in value.items():
-                            self.__getitem__(key).__setitem__(k, v)
-                        return
-                    else:
-                        raise SetItemNotAllowedError(key)
-
-                if not isinstance(value, StampedData):
-                    value = StampedData(value, self._stamper())  # Add timestamp if not already given
-
-                defined_type = self._interface_def[key]
-                set_type = type(value.value)
-                if set_type != defined_type and defined_type not in self.CONVERSION_WHITELIST.get(set_type, []):
-                    raise ConversionError(f"Type of object {value.value} is {type(value.value)} but defined was {defined_type}. "
-                                          f"Interface values must be loyal to their types defined at initialization.")
-                try:
-                    converted_val = defined_type(value.value)
-                except ValueError:
-                    raise ConversionError(f"Could no convert {value.value=} of type {type(value.value)} for key '{key}' to {self._interface_def[key]}.")
-                else:
-                    super().__setitem__(key, StampedData(converted_val, value.timestamp))
-                    if key in self._setitem_callbacks.keys():
-                        self._setitem_callbacks[key](value)
-                    return
+        # No lock is held here, since writes are delegated to _set_leaf() of the owning interface which locks only while storing
+        if isinstance(key, str):  # If dict is accessed using a single key
+            leaf = self._leaf_index.get((key,))
+            if leaf is not None:
+                self._set_leaf(key, value, leaf[2])
+                return
 
-            elif isinstance(key, tuple):  # If dict is accessed using multiple keys
-                d = self.__getitem__(key[:-1])
-                if isinstance(d, DataInterface):
-                    d[key[-1]] = value
-                    return
-                raise TypeError(f"Key {key[-2]} doesn't point to another instance of {DataInterface}. Type of value is {type(d)}.")
+            member = super().get(key)
+            if member is None:
+                raise UnmatchedKeyError(key, self)
+            if isinstance(value, dict):
+                # Parse dict and try to assign values recursively
+                for k, v in value.items():
+                    member.__setitem__(k, v)
+                return
+            raise SetItemNotAllowedError(key)
 
-            raise TypeError(f"Argument 'key' must be a string or a tuple of strings not {type(key)}.")
+        elif isinstance(key, tuple):  # If dict is accessed using multiple keys
+            if key in self._leaf_index:
+                container, leaf_key, defined_type = self._leaf_index[key]
+                container._set_leaf(leaf_key, value, defined_type)
+                return
+            d = self.__getitem__(key[:-1])
+            if isinstance(d, DataInterface):
+                d[key[-1]] = value
+                return
+            raise TypeError(f"Key {key[-2]} doesn't point to another instance of {DataInterface}. Type of value is {type(d)}.")
+
+        raise TypeError(f"Argument 'key' must be a string or a tuple of strings not {type(key)}.")
+
+    def update(self, other=(), /, **kwargs):
+        """
+        Updates multiple items of the data interface. Unlike dict.update() every item is validated by __setitem__().
+
+        :param other: A mapping or an iterable of key-value pairs.
+        :param kwargs: Items specified as keyword arguments.
+        """
+        for key, value in dict(other, **kwargs).items():
+            self.__setitem__(key, value)
+
+    def _set_leaf(self, key: str, value, defined_type: type):
+        """
+        Validates, converts and stores a value for a leaf member of this interface and executes the associated callback.
+        The lock is only held while storing, so that callbacks are free to access this interface again.
+
+        :param key: Key of a leaf member of this DataInterface instance.
+        :param value: Value to be set. It is stamped if it is not already a StampedData instance.
+        :param defined_type: The type the member was defined with.
+        """
+        if not isinstance(value, StampedData):
+            value = StampedData(value, self._stamper())  # Add timestamp if not already given
+
+        stored = value
+        set_type = type(value.value)
+        if set_type is not defined_type:  # Values of the defined type are stored as they are
+            if defined_type not in self.CONVERSION_WHITELIST.get(set_type, ()):
+                raise ConversionError(f"Type of object {value.value} is {type(value.value)} but defined was {defined_type}. "
+                                      f"Interface values must be loyal to their types defined at initialization.")
+            try:
+                stored = StampedData(defined_type(value.value), value.timestamp)
+            except ValueError:
+                raise ConversionError(f"Could no convert {value.value=} of type {type(value.value)} for key '{key}' to {defined_type}.")
+
+        with self._access_lock:
+            super().__setitem__(key, stored)
+        if key in self._setitem_callbacks:
+            self._setitem_callbacks[key](value)
@@ -1,7 +1,9 @@
+import time
 import traceback
 
 from typing import Callable
-from PySide6.QtCore import QTimer, QObject, Signal, QThread
+from threading import Event
+from PySide6.QtCore import QObject, Signal, Slot, QThread
 
 
 class _ConcurrentWorker(QObject):
@@ -12,19 +14,42 @@ class _ConcurrentWorker(QObject):
     failed = Signal(Exception)
     finished = Signal()
 
-    def __init__(self, work_handle: Callable[[], object]):
+    def __init__(self, work_handle: Callable[[], object], repeat_ms: int = None):
         super().__init__()
         self._do_work = work_handle
+        self._repeat_sec = None if repeat_ms is None else repeat_ms / 1000
+        self._stop_event = Event()
 
+    @Slot()
     def run(self):
+        if self._repeat_sec is None:
+            self._execute()
+        else:
+            # Loop directly in the worker thread instead of being triggered by a QTimer, which costs event loop dispatches on every tick
+            next_tick = time.perf_counter()
+            while not self._stop_event.is_set():
+                self._execute()
+                next_tick += self._repeat_sec
+                remaining = next_tick - time.perf_counter()
+                if remaining > 0:
+                    self._stop_event.wait(remaining)
+                else:
+                    next_tick = time.perf_counter()  # Don't try to catch up on missed ticks
+        self.finished.emit()
+
+    def stop(self):
+        """
+        Requests the loop to end after the current execution. Can be called from any thread.
+        """
+        self._stop_event.set()
+
+    def _execute(self):
         try:
             ret = self._do_work()
         except Exception as e:
             self.failed.emit(e)
         else:
             self.success.emit(ret)
-        finally:
-            self.finished.emit()
 
 
 class ConcurrentTask(QObject):
@@ -45,7 +70,7 @@ class ConcurrentTask(QObject):
         super().__init__()
 
         def create_worker():
-            worker = _ConcurrentWorker(work_handle)
+            worker = _ConcurrentWorker(work_handle, repeat_ms)
             if on_success:
                 worker.success.connect(on_success)
             if on_failed:
@@ -54,23 +79,15 @@ class ConcurrentTask(QObject):
                 def raise_ex(exception: Exception):
                     raise self.WorkFailedError(work_handle, exception)
                 worker.failed.connect(raise_ex)
-            return worker
-
-        def create_timer():
-            timer = QTimer()
             if repeat_ms is None:
-                timer.setSingleShot(True)
-            else:
-                timer.setInterval(repeat_ms)
-            return timer
+                worker.finished.connect(self.stop)
+            return worker
 
         self._create_worker = create_worker
-        self._create_timer = create_timer
         self._thread: QThread | None = None
 
         # References that have to be kept alive for the task to work
         self._worker: _ConcurrentWorker | None = None
-        self._timer: QTimer | None = None
 
     @property
     def is_active(self):
@@ -82,15 +99,9 @@ class ConcurrentTask(QObject):
         """
         if not self.is_active:
             self._worker = self._create_worker()
-            self._timer = self._create_timer()
             self._thread = QThread()
             self._worker.moveToThread(self._thread)
-            self._timer.moveToThread(self._thread)  # Let timer execute in subthread to reduce signal clutter in main thread when using quick intervals
-            self._timer.timeout.connect(self._worker.run)
-            if self._timer.isSingleShot():
-                self._worker.finished.connect(self.stop)
-            self._thread.started.connect(self._timer.start)
-            self._thread.finished.connect(self._timer.stop)
+            self._thread.started.connect(self._worker.run)
             self._thread.start()
             self.started.emit()
         else:
@@ -102,9 +113,9 @@ class ConcurrentTask(QObject):
         blocks the calling thread until the worker has finished.
         """
         if self.is_active:
+            self._worker.stop()
             self._thread.quit()
             self._thread.wait()
             self._thread = None
             self._worker = None
-            self._timer = None
             self.stopped.emit()
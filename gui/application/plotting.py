@@ -1,19 +1,21 @@
+import colorsys
+import warnings
+import traceback
 import numpy as np
-import seaborn as sns
 import pyqtgraph as pg
 import configuration as config
 
-from functools import partial
+from functools import partial, lru_cache
 from typing import Callable, overload
 from dataclasses import dataclass
 from collections import UserDict
-from PySide6.QtCore import QTimer, Signal, QObject, SignalInstance
+from PySide6.QtCore import Qt, QTimer, Signal, QObject, SignalInstance
 from PySide6.QtGui import QFont
 from .helper import program_uptime
 from .communication.interface import StampedData, DataInterface, DataInterfaceDefinition
 
 
-@dataclass(frozen=True, eq=True)
+@dataclass(frozen=True, eq=True, slots=True)
 class CurveDefinition:
     """
     This class defines a curve by a label and a getter function.
@@ -37,6 +39,9 @@ class CurveDefinition:
         """
         return cls(label, lambda: StampedData(getter(), stamper()))
 
+    def get_data(self):
+        return self._get_data()
+
     def get_value(self):
         return self._get_data().value
 
@@ -44,7 +49,7 @@ class CurveDefinition:
         return self._get_data().timestamp
 
 
-@dataclass
+@dataclass(slots=True)
 class ColouredCurve:
     """
     Helper class to define an initial color together with the curve.
@@ -60,9 +65,19 @@ class ColouredCurve:
 class CurveLibrary:
     _DEFS: dict[str, CurveDefinition] = {}
 
+    @staticmethod
+    @lru_cache
+    def _color_palette(n_colors: int) -> tuple[str, ...]:
+        """
+        Creates n_colors evenly spaced hues of equal lightness and saturation as hex strings.
+        This replaces the husl palette of seaborn, whose import alone took a large part of the application startup.
+        """
+        rgb_colors = [colorsys.hls_to_rgb((0.01 + index / n_colors) % 1, 0.6, 0.85) for index in range(n_colors)]
+        return tuple('#' + ''.join(f'{round(255 * channel):02x}' for channel in rgb) for rgb in rgb_colors)
+
     @classmethod
     def colorize(cls, curves: list[str] | list[CurveDefinition]):
-        color_palette = sns.color_palette('husl', len(curves)).as_hex()
+        color_palette = cls._color_palette(len(curves))
         return [ColouredCurve(curve, color_palette[index]) if isinstance(curve, CurveDefinition) else cls.definitions(curve, color_palette[index]) for index, curve in enumerate(curves)]
 
     @classmethod
@@ -75,7 +90,7 @@ class CurveLibrary:
             for key, val in definition.items():
                 _accessor = accessor + [key]
                 if val in [float, int, bool]:
-                    cls.add_definition('/'.join(_accessor).upper(), CurveDefinition('/'.join(_accessor), partial(interface.get, tuple(_accessor))))
+                    cls.add_definition('/'.join(_accessor).upper(), CurveDefinition('/'.join(_accessor), interface.getter(tuple(_accessor))))
                 elif isinstance(val, DataInterfaceDefinition):
                     add_data_interface_curves(_accessor, val)
 
@@ -117,7 +132,10 @@ class ScheduledValue(QObject):
         :param interval_ms: Rate to update the value in milliseconds. The updated signal will be emitted at that rate.
         """
         super().__init__()
-        self._register_arr = np.array([0])
+        # Running sum and count of the values registered since the last request, so registering doesn't have to store them
+        self._register_sum = 0.0
+        self._register_count = 0
+        self._value = 0.0
         self._register_timer = QTimer()
         self._register_timer.timeout.connect(lambda: self._register(getter()))
         self._register_timer.setInterval(round(1000 / config.PARAMETERS.plot_update_rate_ms))
@@ -139,22 +157,74 @@ class ScheduledValue(QObject):
 
     def _register(self, value: float):
         """
-        Registers a new value in the array.
+        Registers a new value for the average.
 
         :param value: The new value to register.
         """
-        self._register_arr = np.append(self._register_arr, [value])
+        self._register_sum += value
+        self._register_count += 1
 
     def _request(self):
         """
-        Returns the average of all registered values.
+        Returns the average of all values registered since the last request. If none were registered, the previous average is returned.
+        """
+        if self._register_count:
+            self._value = self._register_sum / self._register_count
+            self._register_sum = 0.0
+            self._register_count = 0
+        return self._value
+
+
+class SharedTimer:
+    """
+    A timer that is shared by all callbacks refreshing at the same interval.
+    This way multiple graphs wake up the event loop only once per tick instead of once per graph.
+    """
+    _INSTANCES: dict[int, "SharedTimer"] = {}
+
+    def __init__(self, interval_ms: int):
+        self._callbacks: list[Callable[[], None]] = []
+        self._timer = QTimer()
+        self._timer.setTimerType(Qt.PreciseTimer)  # The default coarse timer may deviate by up to 5 % of the interval, which makes the sample spacing uneven
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._timeout)
+
+    @classmethod
+    def get(cls, interval_ms: int) -> "SharedTimer":
+        """
+        Returns the timer for the given interval and creates it if necessary.
+
+        :param interval_ms: Timeout interval in milliseconds.
         """
-        value = np.mean(self._register_arr)
-        self._register_arr = np.array([])
-        return value
+        if interval_ms not in cls._INSTANCES:
+            cls._INSTANCES[interval_ms] = cls(interval_ms)
+        return cls._INSTANCES[interval_ms]
+
+    def subscribe(self, callback: Callable[[], None]):
+        if callback not in self._callbacks:
+            self._callbacks.append(callback)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def unsubscribe(self, callback: Callable[[], None]):
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    def _timeout(self):
+        if not self._callbacks:  # Stopping here instead of in unsubscribe keeps unsubscribing safe while the application is torn down
+            self._timer.stop()
+        for callback in tuple(self._callbacks):  # Callbacks may unsubscribe themselves while being called
+            try:
+                callback()
+            except Exception as exc:  # A failing callback would otherwise starve all others sharing this timer
+                self.unsubscribe(callback)
+                warnings.warn(f"Unsubscribed refresh callback '{getattr(callback, '__qualname__', callback)}' from the shared timer after it raised: \n"
+                              f"{''.join(traceback.format_exception(exc))}", RuntimeWarning)
 
 
 class TimeseriesCurve(pg.PlotDataItem):
+    RECORDING_INITIAL_CAPACITY = 1024
+
     def __init__(self, label: str, color: any, window_size_sec: float):
         """
         A pyqtgraph PlotDataItem that scrolls the x axis when its data is being updated.
@@ -164,10 +234,21 @@ class TimeseriesCurve(pg.PlotDataItem):
         :param window_size_sec: The length of the plotted curve in seconds.
         """
         super().__init__(name=label, pen=pg.mkPen(color=color, width=1))
+        self.setDownsampling(auto=True, method='peak')  # Let pyqtgraph reduce the samples to about as many as there are pixels while preserving the peaks
         self._window_duration = window_size_sec
-        self._visible_timeseries = np.array([[], []])
+
+        # The visible timeseries is the slice [start:end] of a preallocated buffer. New samples are written behind it and old ones are dropped by advancing start.
+        # Only when the end of the buffer is reached, the visible part is moved back to the front, so appending is amortized O(1) instead of copying all samples every time.
+        self._timeseries_buffer = np.empty((2, 0))
+        self._visible_start = 0
+        self._visible_end = 0
+        self._last_ts: float | None = None
+        self._redraw_pending = False
+
+        # Store the entire data received inside an extra buffer that doubles its capacity whenever it is full
         self._recording_active = False
-        self._recording_arr = np.array([[], []])  # Store the entire data received inside an extra array
+        self._recording_buffer = np.empty((2, self.RECORDING_INITIAL_CAPACITY))
+        self._recording_len = 0
 
     @property
     def recording(self):
@@ -176,37 +257,70 @@ class TimeseriesCurve(pg.PlotDataItem):
     @recording.setter
     def recording(self, val: bool):
         if val:
-            self._recording_arr = np.array([[], []])  # Reset recording array
+            self._recording_len = 0  # Reset recording
         self._recording_active = val
 
     @property
     def recording_array(self):
-        return self._recording_arr
+        return self._recording_buffer[:, :self._recording_len]
 
-    def append_data(self, value: float | None, ts: float | None):
+    def append_data(self, value: float | None, ts: float | None, display: bool = True):
         """
         Updates the curve of the plot by appending a new value at the provided frame timestamp ts.
         The initially defined window size in seconds will be respected.
 
         :param value: Value to append to the curve.
         :param ts: Timestamp of the value that indicates the time elapsed since the start of the application.
+        :param display: If false, the value is only buffered and the displayed curve is not updated.
         """
         if ts is not None:
-            # Initialize timeseries if first time calling
+            # The same stamped value is appended repeatedly as long as nothing new was received, so neither buffer nor redraw it again
+            if ts == self._last_ts:
+                if display and self._redraw_pending:
+                    self._redraw()
+                return
+            self._last_ts = ts
             _value = np.nan if value is None else value
-            if not self._visible_timeseries.any():
-                t = np.linspace(ts - self._window_duration, ts, round(self._window_duration * config.PARAMETERS.plot_update_rate_ms))  # Initial time axis which is subject to change
-                self._visible_timeseries = np.array([t, np.full(t.shape[0], np.nan)])  # Initial values np.nan
 
-            # Extend recording array
+            # Initialize timeseries if first time calling
+            if self._visible_end == 0:
+                size = round(self._window_duration * config.PARAMETERS.plot_update_rate_ms)
+                self._timeseries_buffer = np.empty((2, 2 * size))
+                self._timeseries_buffer[0, :size] = np.linspace(ts - self._window_duration, ts, size)  # Initial time axis which is subject to change
+                self._timeseries_buffer[1, :size] = np.nan  # Initial values np.nan
+                self._visible_start, self._visible_end = 0, size
+
+            # Extend recording buffer
             if self._recording_active:
-                self._recording_arr = np.append(self._recording_arr, [[ts], [_value]], axis=1)
-
-            # Extend the timeseries data of the curve
-            self._visible_timeseries = np.append(self._visible_timeseries, [[ts], [_value]], axis=1)
-            while self._visible_timeseries[0, -1] - self._visible_timeseries[0, 0] > self._window_duration:
-                self._visible_timeseries = np.delete(self._visible_timeseries, 0, axis=1)
-            self.setData(self._visible_timeseries[0], self._visible_timeseries[1])
+                if self._recording_len == self._recording_buffer.shape[1]:
+                    self._recording_buffer = np.concatenate([self._recording_buffer, np.empty_like(self._recording_buffer)], axis=1)
+                self._recording_buffer[:, self._recording_len] = ts, _value
+                self._recording_len += 1
+
+            # Make room behind the visible timeseries by moving it to the front of the buffer or growing the buffer if it is more than half full
+            if self._visible_end == self._timeseries_buffer.shape[1]:
+                size = self._visible_end - self._visible_start
+                if 2 * size > self._timeseries_buffer.shape[1]:
+                    buffer = np.empty((2, 2 * size))
+                    buffer[:, :size] = self._timeseries_buffer[:, self._visible_start:self._visible_end]
+                    self._timeseries_buffer = buffer
+                else:
+                    self._timeseries_buffer[:, :size] = self._timeseries_buffer[:, self._visible_start:self._visible_end]
+                self._visible_start, self._visible_end = 0, size
+
+            # Extend the timeseries data of the curve and drop the samples that are older than the window
+            self._timeseries_buffer[:, self._visible_end] = ts, _value
+            self._visible_end += 1
+            t = self._timeseries_buffer[0, self._visible_start:self._visible_end]
+            self._visible_start += int(np.searchsorted(t, ts - self._window_duration))
+            if display:
+                self._redraw()
+            else:
+                self._redraw_pending = True
+
+    def _redraw(self):
+        self.setData(self._timeseries_buffer[0, self._visible_start:self._visible_end], self._timeseries_buffer[1, self._visible_start:self._visible_end])
+        self._redraw_pending = False
 
 
 class MonitoringGraph(pg.PlotItem):
@@ -237,23 +351,23 @@ class MonitoringGraph(pg.PlotItem):
 
         # Add data to plot
         self._curves_dict: dict[CurveDefinition, TimeseriesCurve] = {}
+        self._update_fns: list[Callable[[bool], None]] = []  # Prebound per curve update routines that are called on every timer tick
         if curves:
             for curve in curves:
                 self.add_curve(curve)
 
-        self._timer = QTimer()
-        self._timer.setInterval(interval_ms)
-        self._timer.timeout.connect(self._update)
+        self._timer = SharedTimer.get(interval_ms)
+        self.destroyed.connect(partial(self._timer.unsubscribe, self._update))  # Don't leave a dangling callback behind if the graph gets deleted while updating
         if start_signal is not None:
-            start_signal.connect(self._timer.start)
+            start_signal.connect(self.start_updating)
         if stop_signal is not None:
-            stop_signal.connect(self._timer.stop)
+            stop_signal.connect(self.stop_updating)
 
     def start_updating(self):
-        self._timer.start()
+        self._timer.subscribe(self._update)
 
     def stop_updating(self):
-        self._timer.stop()
+        self._timer.unsubscribe(self._update)
 
     def add_curve(self, curve: ColouredCurve):
         if not isinstance(curve, ColouredCurve):
@@ -261,10 +375,12 @@ class MonitoringGraph(pg.PlotItem):
         _curve = TimeseriesCurve(curve.definition.label, curve.color, self._window_size)
         self._curves_dict[curve.definition] = _curve
         self.addItem(_curve)
+        self._bind_update_fns()
 
     def remove_curve(self, curve_definition: CurveDefinition):
         self.removeItem(self._curves_dict[curve_definition])
         del self._curves_dict[curve_definition]
+        self._bind_update_fns()
 
     @property
     def title(self):
@@ -278,9 +394,25 @@ class MonitoringGraph(pg.PlotItem):
     def curves_dict(self):
         return self._curves_dict
 
+    def _bind_update_fns(self):
+        """
+        Creates the update routines of all curves once whenever the curves of this graph change,
+        so the timer callback doesn't have to resolve the curves and their methods on every tick.
+        """
+        def make_update_fn(get_data: Callable[[], StampedData], append_data: Callable[[float | None, float | None, bool], None]):
+            def update(display: bool):
+                data = get_data()
+                append_data(data.value, data.timestamp, display)
+            return update
+
+        self._update_fns = [make_update_fn(curve_def.get_data, time_curve.append_data) for curve_def, time_curve in self._curves_dict.items()]
+
     def _update(self):
-        for curve_def, time_curve in self._curves_dict.items():
-            time_curve.append_data(curve_def.get_value(), curve_def.get_timestamp())
+        # Keep buffering while the graph can't be seen, but skip redrawing the curves which is by far the most expensive part
+        view = self.getViewWidget()
+        display = view is not None and view.isVisible() and not view.window().isMinimized()
+        for update in self._update_fns:
+            update(display)
 
 
 class GraphDict(UserDict):
@@ -289,8 +421,10 @@ class GraphDict(UserDict):
         self._layout = graphics_layout_widget.ci
 
     def __setitem__(self, key: int, item: MonitoringGraph):
-        assert isinstance(key, int), TypeError("Keys have to be strings!")
-        assert isinstance(item, MonitoringGraph), TypeError("Items have to be instances of MonitoringGraph!")
+        if not isinstance(key, int):
+            raise TypeError(f"Keys have to be integers not {type(key)}.")
+        if not isinstance(item, MonitoringGraph):
+            raise TypeError(f"Items have to be instances of {MonitoringGraph} not {type(item)}.")
 
         # Remove old graph
         if key in self.keys():
@@ -307,4 +441,5 @@ class GraphDict(UserDict):
         super().__delitem__(key)
 
     def _remove_graph_from_layout(self, key: int):
+        self.data[key].stop_updating()
         self._layout.removeItem(self.data[key])
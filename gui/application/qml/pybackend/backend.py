@@ -54,7 +54,7 @@ class NotifiedPropertyInstace(Property):
     """
 
     def __init__(self, type_: type, name: str, notifier: Signal):
-        super().__init__(type_, self._getter, self._setter, notify=notifier)
+        super().__init__(type_, self._getter, self._setter, notify=notifier, final=True)  # Final lets the QML engine resolve the property once instead of on every read
         self._value = type_()
         self._signal_attr_name = f'{name}_changed'
 
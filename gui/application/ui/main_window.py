@@ -4,19 +4,23 @@ import configuration as config
 from typing import Literal, Callable
 from pathlib import Path
 from application.communication.device import BluetoothDevice
-from application.communication.interface import StampedData, DataInterface
+from application.communication.interface import StampedData
 from application.plotting import MonitoringGraph, GraphDict, CurveDefinition, CurveLibrary, UserDict
 from application.concurrent import ConcurrentTask
 from application.ui.monitoring_window import MonitoringWindow
 from application.qml.widget import SetpointSlider, ParameterSection, StatusSection
 from functools import partial
 from resources.main_window_ui import Ui_MainWindow
-from PySide6.QtCore import QTime
+from PySide6.QtCore import QTime, QTimer, Slot
 from PySide6.QtGui import QCloseEvent, QGuiApplication
 from PySide6.QtWidgets import QMainWindow, QProgressBar, QLabel, QFileDialog
 
 
 class MinSegGUI(QMainWindow):
+    PARAMETER_CHANGE_COALESCE_MS = 16
+    SETPOINT_SEND_INTERVAL_MS = 50
+    CONSOLE_FLUSH_INTERVAL_MS = 50
+
     def __init__(self):
         super().__init__(None)
         self.ui = Ui_MainWindow()
@@ -36,6 +40,11 @@ class MinSegGUI(QMainWindow):
             on_success=self.on_bt_connected,
             on_failed=self.on_bt_connection_failed
         )
+        self.bt_transmit_task = ConcurrentTask(
+            self.bt_device.transmit,
+            on_failed=self.ui.actionDisconnect.trigger,
+            repeat_ms=0
+        )
         self.bt_receive_task = ConcurrentTask(
             self.bt_device.receive,
             on_success=self.on_bt_received,
@@ -59,7 +68,7 @@ class MinSegGUI(QMainWindow):
 
         # Add interface set callbacks
         self.bt_device.rx_data.execute_when_set("calibrated", self.on_calibrated)
-        self.bt_device.rx_data.execute_when_set("msg", lambda msg: self.ui.console.append(f"{QTime.currentTime().toString()} -> {msg.value}"))
+        self.bt_device.rx_data.execute_when_set("msg", self.buffer_console_message)
 
         # Curve definitions
         CurveLibrary.add_definition("BYTES_RECEIVED", CurveDefinition.make("bytes_received", lambda: self.bt_bytes_received))
@@ -74,11 +83,30 @@ class MinSegGUI(QMainWindow):
         self.setpoint_slider = SetpointSlider(self.ui.setpoint_slider_frame, 0)
 
         # TX interface connections
-        self.setpoint_slider.value_changed.connect(
-            lambda val: self.do_catch_ex_in_statusbar(lambda: self.bt_device.send(pos_setpoint_mm=val * 10), [self.bt_device.NotConnectedError, ConnectionAbortedError], "Failed to Send Setpoint")
-        )
+        self.setpoint_slider.value_changed.connect(self.on_setpoint_changed)
         self.status_section.control_switch_state_changed.connect(self.on_control_state_change)
-        self.parameter_section.last_change_changed.connect(lambda changed: self.update_parameters("variable", changed))
+        self.parameter_section.last_change_changed.connect(self.buffer_parameter_change)
+
+        # Parameter changes arrive per edited field, so they are merged and applied at most once per coalescing interval
+        self._pending_parameter_changes: dict[str, dict] = {}
+        self._parameter_change_timer = QTimer(self)
+        self._parameter_change_timer.setSingleShot(True)
+        self._parameter_change_timer.setInterval(self.PARAMETER_CHANGE_COALESCE_MS)
+        self._parameter_change_timer.timeout.connect(self.flush_parameter_changes)
+
+        # The first setpoint change is sent immediately, while further changes within the send interval are batched to a single send of the latest value
+        self._setpoint_send_pending = False
+        self._setpoint_send_timer = QTimer(self)
+        self._setpoint_send_timer.setSingleShot(True)
+        self._setpoint_send_timer.setInterval(self.SETPOINT_SEND_INTERVAL_MS)
+        self._setpoint_send_timer.timeout.connect(self.on_setpoint_send_interval_elapsed)
+
+        # Received messages are written to the console at most once per flush interval, because every append relayouts and repaints the console
+        self._pending_console_lines: list[str] = []
+        self._console_flush_timer = QTimer(self)
+        self._console_flush_timer.setSingleShot(True)
+        self._console_flush_timer.setInterval(self.CONSOLE_FLUSH_INTERVAL_MS)
+        self._console_flush_timer.timeout.connect(self.flush_console)
 
         # Add graphs to overview
         self.graphs: UserDict[int, MonitoringGraph] = GraphDict(self.ui.plot_overview)
@@ -103,6 +131,7 @@ class MinSegGUI(QMainWindow):
             return True
 
     def send_tx_data_state(self):
+        self.flush_parameter_changes()
         self.bt_device.send(data=self.bt_device.tx_data)
         self.status_section.loaded_param_state = 1
 
@@ -127,7 +156,8 @@ class MinSegGUI(QMainWindow):
         self.ui.actionParamSend.setEnabled(True)
         self.status_section.connection_state = 2
 
-        # Start receiving
+        # Start transmitting and receiving
+        self.bt_transmit_task.start()
         self.bt_receive_task.start()
 
         self.ui.actionTransmitState.trigger()
@@ -142,6 +172,8 @@ class MinSegGUI(QMainWindow):
     def on_bt_disconnect(self):
         self.bt_receive_task.stop()
         self.status_section.control_switch_state = False
+        self.bt_transmit_task.stop()
+        self.do_catch_ex_in_statusbar(lambda: self.bt_device.transmit(timeout=0), [self.bt_device.NotConnectedError, OSError])  # Send what is still queued like the control state change
 
         self.bt_device.disconnect()
         self.ui.actionConnect.setEnabled(True)
@@ -150,18 +182,20 @@ class MinSegGUI(QMainWindow):
         self.ui.actionTransmitState.setEnabled(False)
         self.ui.actionParamSend.setEnabled(False)
         self.ui.statusbar.showMessage("Disconnected from device!", 3000)
+        self._pending_console_lines.clear()
         self.ui.console.clear()
         self.status_section.connection_state = 0
         self.status_section.calibration_state = 0
         self.status_section.loaded_param_state = 0  # Change state to not yet sent
 
-    def on_bt_received(self, received: bytes):
+    def on_bt_received(self, received: list[bytes]):
         if not received:
             return
 
-        self.bt_bytes_received = len(received)
+        self.bt_bytes_received = sum(len(msg) for msg in received)
         self.bt_device.rx_data.update_receive_time()  # Update receive timestamp
-        self.bt_device.deserialize(received)  # Update RX interface
+        for msg in received:
+            self.bt_device.deserialize(msg)  # Update RX interface
 
     def on_start_calibration(self):
         self.status_section.calibration_state = 0
@@ -210,15 +244,17 @@ class MinSegGUI(QMainWindow):
             path = Path(path)
             if path.suffix != '.json':
                 path += '.json'
+            self.flush_parameter_changes()
             with path.open('w') as file:
-                json.dump(self.bt_device.tx_data["parameters"], file, cls=DataInterface.JSONEncoder, indent=2)
+                json.dump(self.bt_device.tx_data["parameters"].as_dict(), file, indent=2)
 
             # Update loaded param file name
             self.status_section.param_file_name = path.name
-            self.status_section.loaded_param_state = self.status_section.loaded_param_state
 
     def send_parameters(self, subkey: Literal["variable", "inferred"] = None):
-        do_send = partial(self.bt_device.send, key="parameters") if subkey is None else partial(self.bt_device.send, key=("parameters", subkey))
+        self.flush_parameter_changes()  # Make sure that no buffered change is left out or applied after sending
+        # Only parameters that differ from the ones already known by the device need to be transmitted
+        do_send = partial(self.bt_device.send, key="parameters" if subkey is None else ("parameters", subkey), only_changed=True)
         if self.do_catch_ex_in_statusbar(do_send, [self.bt_device.NotConnectedError, ConnectionAbortedError], "Failed to Send Parameters"):
             self.status_section.loaded_param_state = 1
 
@@ -226,10 +262,50 @@ class MinSegGUI(QMainWindow):
         self.bt_device.tx_data["parameters", subkey].update(changed)
         self.status_section.loaded_param_state = 0  # Change state to not yet sent
 
+    def buffer_parameter_change(self, changed: dict):
+        for group, values in changed.items():
+            self._pending_parameter_changes.setdefault(group, {}).update(values)
+        self._parameter_change_timer.start()  # (Re)start the timer so a burst of changes results in a single update
+
+    @Slot()
+    def flush_parameter_changes(self):
+        self._parameter_change_timer.stop()
+        if self._pending_parameter_changes:
+            changed, self._pending_parameter_changes = self._pending_parameter_changes, {}
+            self.update_parameters("variable", changed)
+
+    def buffer_console_message(self, msg: StampedData):
+        self._pending_console_lines.append(f"{QTime.currentTime().toString()} -> {msg.value}")
+        if not self._console_flush_timer.isActive():
+            self._console_flush_timer.start()
+
+    @Slot()
+    def flush_console(self):
+        if self._pending_console_lines:
+            self.ui.console.append("\n".join(self._pending_console_lines))
+            self._pending_console_lines.clear()
+
+    def on_setpoint_changed(self):
+        if self._setpoint_send_timer.isActive():
+            self._setpoint_send_pending = True  # The latest setpoint is sent when the current send interval has elapsed
+        else:
+            self.send_setpoint()
+
+    def on_setpoint_send_interval_elapsed(self):
+        if self._setpoint_send_pending:
+            self.send_setpoint()
+
+    def send_setpoint(self):
+        self._setpoint_send_pending = False
+        self._setpoint_send_timer.start()
+        # The slider may end up at the position that was sent last, which doesn't need to be transmitted again
+        self.do_catch_ex_in_statusbar(lambda: self.bt_device.send(pos_setpoint_mm=self.setpoint_slider.value * 10, only_changed=True), [self.bt_device.NotConnectedError, ConnectionAbortedError], "Failed to Send Setpoint")
+
     def on_control_state_change(self, state: bool):
-        self.do_catch_ex_in_statusbar(lambda: self.bt_device.send(control_state=state), [self.bt_device.NotConnectedError, ConnectionAbortedError], "Failed to Send Control State Change")
-        if not state:
-            self.setpoint_slider.value = 0
+        with self.bt_device.batch():  # Transmit the state change together with the setpoint reset
+            self.do_catch_ex_in_statusbar(lambda: self.bt_device.send(control_state=state), [self.bt_device.NotConnectedError, ConnectionAbortedError], "Failed to Send Control State Change")
+            if not state:
+                self.setpoint_slider.value = 0
 
     def closeEvent(self, event: QCloseEvent):
         for monitor in self.monitors:
@@ -1,4 +1,5 @@
 import itertools
+import numpy as np
 import pandas as pd
 import configuration as config
 
@@ -101,11 +102,16 @@ class MonitoringWindow(QMainWindow):
             rec_dir.mkdir()
         path, _ = QFileDialog.getSaveFileName(self, "Save Monitoring Data", str(rec_dir), "CSV (*.csv)")
         if path:
-            df = []
+            # Copy all recordings into a single NaN padded array, so that only one DataFrame has to be built instead of concatenating one per curve
+            columns, recordings = [], []
             for graph in self.graphs.values():
                 for curve_def, curve in graph.curves_dict.items():
-                    df.append(pd.DataFrame(curve.recording_array.T, columns=pd.MultiIndex.from_product([[graph.title], [curve_def.label], ['Time', 'Value']])))
-            df = pd.concat(df, axis=1)
+                    columns += [(graph.title, curve_def.label, 'Time'), (graph.title, curve_def.label, 'Value')]
+                    recordings.append(curve.recording_array)
+            data = np.full((max((rec.shape[1] for rec in recordings), default=0), len(columns)), np.nan)
+            for index, rec in enumerate(recordings):
+                data[:rec.shape[1], 2 * index:2 * index + 2] = rec.T
+            df = pd.DataFrame(data, columns=pd.MultiIndex.from_tuples(columns) if columns else None)
 
             if Path(path).suffix != '.csv':
                 path += '.csv'
@@ -6,6 +6,7 @@ HC06_BLUETOOTH_ADDRESS = "98:D3:A1:FD:34:63"
 JSON_INTERFACE_DEFINITION_PATH = Path(__file__).parent.parent / "interface.json"
 DEFAULT_RECORDING_DIR = Path(__file__).parent.parent / "recording"
 PARAMETERS_DIR = Path(__file__).parent.parent / "data" / "parameters"
+MSGPACK_SERIALIZATION = True  # Serialize messages using MessagePack instead of JSON. Must match ENABLE_MSGPACK_SERIALIZATION of the controller.
 
 
 class Parameters(QObject):
@@ -2,5 +2,6 @@ import matplotlib.pyplot as plt
 
 from pathlib import Path
 from .plot import TimeSeriesPlot
+from .recording import load_recording
 
 plt.style.use(Path(__file__).parent / "presentation.mplstyle")
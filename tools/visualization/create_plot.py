@@ -1,7 +1,6 @@
-import pandas as pd
 import configuration as config
 
-from tools.visualization import TimeSeriesPlot
+from tools.visualization import TimeSeriesPlot, load_recording
 from pathlib import Path
 
 FIGURE_EXPORT_DIR = Path(__file__).parent.parent.parent / "images"
@@ -9,7 +8,7 @@ FIGURE_EXPORT_DIR = Path(__file__).parent.parent.parent / "images"
 
 def main():
     record_file = config.DEFAULT_RECORDING_DIR / "position.csv"
-    df = pd.read_csv(record_file, header=[0, 1, 2], index_col=0)
+    df = load_recording(record_file)
     df.sort_index(axis=1, inplace=True)
 
     data = {
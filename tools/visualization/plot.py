@@ -1,14 +1,18 @@
+import numpy as np
 import pandas as pd
 
 from . import plt
 
 
 class TimeSeriesPlot:
+    RASTERIZE_MIN_SAMPLES = 20000  # Longer curves are rasterized in vector exports, since every sample would otherwise become a path node
+
     def __init__(self, title: str = None, **data: list[tuple[str, pd.DataFrame]]):
         self._fig, self._ax = plt.subplots(len(data), 1, sharex='all', squeeze=False)
         for index, (label, timeseries) in enumerate(data.items()):
             for name, df in timeseries:
-                self._ax[index, 0].plot(df.iloc[:, 0] - df.iloc[:, 0].min(), df.iloc[:, 1], label=name)
+                time, value = df.iloc[:, 0].to_numpy(), df.iloc[:, 1].to_numpy()  # Plain arrays skip the index alignment of pandas arithmetic
+                self._ax[index, 0].plot(time - np.nanmin(time), value, label=name, rasterized=time.size >= self.RASTERIZE_MIN_SAMPLES)
             self._ax[index, 0].set_ylabel(label)
             self._ax[index, 0].grid(True)
 
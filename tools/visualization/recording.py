@@ -0,0 +1,27 @@
+import pandas as pd
+
+from pathlib import Path
+
+
+def load_recording(record_file: Path) -> pd.DataFrame:
+    """
+    Loads a recording that was saved by a monitoring window.
+    Parsing the csv with its three header rows is slow, so the parsed data is cached in a pickle file next to the recording.
+    The cache is reused as long as it is not older than the recording.
+    If the cache can't be read or written, e.g. because it was created by another pandas version or the directory is read-only, the csv is parsed instead.
+
+    :param record_file: Path to the csv file of the recording.
+    """
+    cache_file = record_file.with_suffix(".pkl")
+    try:
+        if cache_file.exists() and cache_file.stat().st_mtime >= record_file.stat().st_mtime:
+            return pd.read_pickle(cache_file)
+    except Exception:  # Unpickling may fail with almost any exception if the cache is incompatible or corrupted
+        pass
+
+    df = pd.read_csv(record_file, header=[0, 1, 2], index_col=0)
+    try:
+        df.to_pickle(cache_file)
+    except Exception:  # The cache is optional
+        pass
+    return df